@@ -1,127 +1,128 @@
+import io
+import threading
+
+import numpy as np
 import streamlit as st
-import matplotlib.pyplot as plt
-from matplotlib.patches import Ellipse
 
-def get_scale_factor_for_midline(age_months, sex, nasion_inion_dist):
-    """
-    Returns a scaling factor and a precomputed front shift in cm based on age in months and sex.
-    """
-    spacing_factor = 1.0  # Full spacing remains constant
-
-    # Precomputed fractions for front shift
-    if age_months <= 12:
-        # Linear interpolation: 3 cm to 2 cm
-        front_shift_cm = 3 - (age_months / 12) * (3 - 2)
-    elif age_months <= 48:
-        # Linear interpolation: 2 cm to 1 cm
-        front_shift_cm = 2 - ((age_months - 12) / 36) * (2 - 1)
-    elif age_months <= 120:
-        # Linear interpolation: 1 cm to 0 cm
-        front_shift_cm = 1 - ((age_months - 48) / 72) * 1
-    else:
-        # No shift for ages above 120 months
-        front_shift_cm = 0.0
-
-    # Sex factor
-    sex_factor = 0.95 if sex.lower() == 'female' else 1.0
-
-    final_spacing_factor = spacing_factor * sex_factor
-    return final_spacing_factor, front_shift_cm
-
-def get_midline_fractions(age_months, sex, nasion_inion_dist):
+from eeg_core import MIDLINE_LABELS, get_midline_fractions
+
+
+@st.cache_resource
+def _make_blank_fig():
     """
-    Compute the midline fractions with a frontal shift.
-    Ensures all electrodes, including Cz, are adjusted based on the age-dependent scaling and shifting logic.
+    Build the figure skeleton once per process.
+    Reruns only move the existing artists, so matplotlib setup is not repeated.
+    matplotlib is imported here so its start-up cost is paid on the first plot, not on page load.
     """
-    # Calculate spacing and frontal shift based on age and sex
-    spacing_factor, front_shift_cm = get_scale_factor_for_midline(age_months, sex, nasion_inion_dist)
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Ellipse
 
-    # Convert frontal shift to a fraction of the nasion-inion distance
-    front_shift_fraction = front_shift_cm / nasion_inion_dist
+    # A bare Figure bypasses pyplot (no backend selection, no figure registry),
+    # so it lives as long as the cache does
+    fig = Figure(figsize=(6, 6))
+    ax = fig.add_subplot()
 
-    # Electrode offsets relative to Cz
-    offsets = {
-        'Oz': -0.36,
-        'Pz':  -0.18,
-        'Cz':   0.00,  # Cz is the reference point but will also shift
-        'Fz':   0.18,
-        'Fpz':   0.36
-    }
+    # Draw the oval (ellipse); its size is set on every plot
+    ellipse = Ellipse((0, 0), width=1, height=1,
+                      color='blue', fill=False, linestyle='--', label='Head Boundary')
+    ax.add_patch(ellipse)  # Use add_patch instead of add_artist for patches like Ellipse
 
-    # Calculate electrode positions with adjustments
-    fractions = {}
-    for label, offset in offsets.items():
-        # Apply spacing factor and shift all electrodes (including Cz)
-        scaled_offset = offset * spacing_factor
-        fractions[label] = 0.50 + scaled_offset + front_shift_fraction
+    # One artist for all electrodes, plus one label per electrode
+    scatter = ax.scatter([], [], c='red')
+    texts = {label: ax.text(0, 0, label, fontsize=10, ha='center') for label in MIDLINE_LABELS}
+
+    ax.set_aspect('equal', 'box')
+    ax.set_title("Electrode Positions")
+    ax.set_xlabel("Preauricular Distance")
+    ax.set_ylabel("Nasion-Inion Distance")
+    ax.grid(True)
 
-    return fractions, spacing_factor, front_shift_cm
+    # The figure is shared between sessions, so updates and rendering must not interleave
+    lock = threading.Lock()
+
+    return fig, ax, scatter, texts, ellipse, lock
 
 
 def plot_electrode_positions(fractions, nasion_inion_dist, preauricular_dist):
     """
-    Plot the electrode positions on a head circle.
+    Plot the electrode positions on a head circle and return the rendered PNG bytes.
     Adjusts all electrode positions, including Cz, based on the fractions.
     """
-    fig, ax = plt.subplots(figsize=(6, 6))
+    fig, ax, scatter, texts, ellipse, lock = _make_blank_fig()
 
     # Compute the radii for the oval
     radius_y = nasion_inion_dist / 2  # Half the nasion-inion distance
     radius_x = preauricular_dist / 2  # Half the preauricular distance
 
-    # Draw the oval (ellipse)
-    ellipse = Ellipse((0, 0), width=preauricular_dist, height=nasion_inion_dist,
-                      color='blue', fill=False, linestyle='--', label='Head Boundary')
-    ax.add_patch(ellipse)  # Use add_patch instead of add_artist for patches like Ellipse
+    with lock:
+        # Resize the oval (ellipse)
+        ellipse.width = preauricular_dist
+        ellipse.height = nasion_inion_dist
 
-    # Plot electrodes
-    for label, fraction in fractions.items():
-        x = 0
-        y = (fraction - 0.5) * nasion_inion_dist  # Position relative to nasion-inion
-        ax.plot(x, y, 'ro')
-        ax.text(x, y + 0.02, label, fontsize=10, ha='center')
-
-    # Calculate axis limits and ticks
-    max_distance = max(radius_x, radius_y)  # Use the largest radius for scaling
-    tick_step = 0.5
-
-    # Generate ticks
-    #ticks = [tick * tick_step for tick in range(-2 * int(max_distance), 2 * int(max_distance) + 1)]
-    #ticks = [tick for tick in ticks if -max_distance <= tick <= max_distance]
-
-    # Set ticks and axis limits
-    #ax.set_xticks(ticks)
-    #ax.set_yticks(ticks)
-    ax.set_xlim(-radius_x, radius_x)
-    ax.set_ylim(-radius_y, radius_y)
-    
-    ax.set_aspect('equal', 'box')
-    ax.set_title("Electrode Positions")
-    ax.set_xlabel("Preauricular Distance")
-    ax.set_ylabel("Nasion-Inion Distance")
-    ax.grid(True)
+        # Move electrodes, all on the midline (x = 0)
+        xs = np.zeros(len(fractions))
+        ys = (np.asarray(fractions, dtype=np.float64) - 0.5) * nasion_inion_dist  # Position relative to nasion-inion
+        scatter.set_offsets(np.column_stack((xs, ys)))
+        for label, x, y in zip(fractions._fields, xs, ys):
+            texts[label].set_position((x, y + 0.02))
 
-    st.pyplot(fig)
+        # Set axis limits; matplotlib's default locator picks the ticks
+        ax.set_xlim(-radius_x, radius_x)
+        ax.set_ylim(-radius_y, radius_y)
 
+        # Render straight to PNG at st.pyplot's resolution instead of going through st.pyplot
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png', dpi=200, bbox_inches='tight')
 
-# Streamlit UI
-st.title("Electrode Positioning on Scalp")
-st.write("This app calculates and visualizes electrode positions based on age (in months), sex, and head dimensions.")
+    return buf.getvalue()
 
-# Inputs
-age_months = st.slider("Age (months)", min_value=1, max_value=240, value=120, step=1)
-sex = st.selectbox("Sex", ["Male", "Female"])
-nasion_inion_dist = st.number_input("Nasion-Inion Distance (cm)", min_value=20.0, max_value=50.0, value=35.0, step=0.1)
-preauricular_dist = st.number_input("Preauricular Distance (cm)", min_value=20.0, max_value=50.0, value=30.0, step=0.1)
 
-# Calculations
-fractions, spacing_factor, front_shift_cm = get_midline_fractions(age_months, sex, nasion_inion_dist)
+@st.cache_data(max_entries=256)
+def render_png(age_months, sex, nasion_inion_dist, preauricular_dist):
+    """
+    Compute and plot the electrode positions for the given inputs.
+    Results are cached per input, so revisiting a setting skips matplotlib entirely.
+    """
+    fractions, _, _ = get_midline_fractions(age_months, sex, nasion_inion_dist)
+    return plot_electrode_positions(fractions, nasion_inion_dist, preauricular_dist)
 
-# Display Results
-st.write("### Calculated Values")
-st.write(f"**Final Spacing Factor:** {spacing_factor}")
-st.write(f"**Frontal Shift (cm):** {front_shift_cm:.2f} cm")
 
-# Plot
-st.write("### Electrode Positions")
-plot_electrode_positions(fractions, nasion_inion_dist, preauricular_dist)
+def main():
+    """
+    Streamlit UI.
+    """
+    st.title("Electrode Positioning on Scalp")
+    st.write("This app calculates and visualizes electrode positions based on age (in months), sex, and head dimensions.")
+
+    # Inputs, submitted together so editing several values triggers a single rerun
+    with st.form("inputs"):
+        age_months = st.slider("Age (months)", min_value=1, max_value=240, value=120, step=1)
+        sex = st.selectbox("Sex", ["Male", "Female"])
+        nasion_inion_dist = st.number_input("Nasion-Inion Distance (cm)", min_value=20.0, max_value=50.0, value=35.0, step=0.1)
+        preauricular_dist = st.number_input("Preauricular Distance (cm)", min_value=20.0, max_value=50.0, value=30.0, step=0.1)
+        st.form_submit_button("Compute")
+
+    # Quantize to the widgets' precision so float noise cannot split cache entries.
+    # This only narrows the cache keys; eeg_core accepts any real age and distance.
+    # (cache-key error bound: 0.5 month on age, 0.05 cm on distances)
+    age_months = int(round(age_months))
+    nasion_inion_dist = round(nasion_inion_dist, 1)
+    preauricular_dist = round(preauricular_dist, 1)
+
+    # Calculations
+    _, spacing_factor, front_shift_cm = get_midline_fractions(age_months, sex, nasion_inion_dist)
+
+    # Display Results, sent as a single element
+    st.markdown(
+        "### Calculated Values\n\n"
+        f"**Final Spacing Factor:** {spacing_factor}\n\n"
+        f"**Frontal Shift (cm):** {front_shift_cm:.2f} cm\n\n"
+        "### Electrode Positions"
+    )
+
+    # Plot
+    st.image(render_png(age_months, sex, nasion_inion_dist, preauricular_dist), width='stretch')
+
+
+if __name__ == "__main__":
+    main()
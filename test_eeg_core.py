@@ -0,0 +1,37 @@
+import pytest
+
+from eeg_core import get_midline_fractions, get_scale_factor_for_midline
+
+
+def original_front_shift_cm(age_months):
+    """
+    The piecewise front shift ramp as originally written in egg_positions.py.
+    """
+    if age_months <= 12:
+        return 3 - (age_months / 12) * (3 - 2)
+    elif age_months <= 48:
+        return 2 - ((age_months - 12) / 36) * (2 - 1)
+    elif age_months <= 120:
+        return 1 - ((age_months - 48) / 72) * 1
+    else:
+        return 0.0
+
+
+@pytest.mark.parametrize("age_months", [0, 1, 6, 12, 12.5, 30, 47.9, 48, 100.25, 120, 121, 240, 300])
+def test_front_shift_matches_original_ramp(age_months):
+    _, front_shift_cm = get_scale_factor_for_midline(age_months, 'Male', 35.0)
+    assert front_shift_cm == pytest.approx(original_front_shift_cm(age_months))
+
+
+@pytest.mark.parametrize("sex, expected", [('Male', 1.0), ('Female', 0.95), ('female', 0.95)])
+def test_spacing_factor_by_sex(sex, expected):
+    spacing_factor, _ = get_scale_factor_for_midline(24, sex, 35.0)
+    assert spacing_factor == expected
+
+
+def test_midline_fractions_shift_all_electrodes():
+    fractions, spacing_factor, front_shift_cm = get_midline_fractions(6, 'Female', 35.0)
+    shift = front_shift_cm / 35.0
+    assert fractions.Cz == pytest.approx(0.5 + shift)
+    assert fractions.Fpz == pytest.approx(0.5 + 0.36 * spacing_factor + shift)
+    assert fractions.Oz == pytest.approx(0.5 - 0.36 * spacing_factor + shift)